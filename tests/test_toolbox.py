@@ -1,9 +1,20 @@
 # pyright: reportUnusedFunction=false
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any, Callable
+
+import pytest
 from openai.types.chat import ChatCompletionMessage, ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_chunk import (
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
 from openai.types.chat.chat_completion_message_tool_call import Function
 
 from toolbox import Toolbox
-from toolbox.messages import SuccessResult
+from toolbox.messages import ErrorResult, SuccessResult, serialize_results
 
 
 def test_hello_world():
@@ -57,3 +68,500 @@ def test_hello_world():
     assert isinstance(results[0], SuccessResult)
     assert results[0].name == "hello_world"
     assert results[0].content == "Hello world"
+
+
+def test_tools_schema_is_cached_until_registration():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Returns the current time")
+    def now():
+        return "noon"
+
+    tools = toolbox.tools
+    assert toolbox.tools is tools
+
+    @toolbox.function(description="Returns the current date")
+    def today():
+        return "monday"
+
+    assert toolbox.tools is not tools
+    assert len(toolbox.tools) == 2
+
+
+def test_parameter_type_from_optional_annotation():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Repeats a word")
+    @toolbox.parameter(name="times", required=False)
+    def repeat(times: int | None = None):
+        return "word" * (times or 1)
+
+    assert toolbox.tools == [
+        {
+            "type": "function",
+            "function": {
+                "name": "repeat",
+                "description": "Repeats a word",
+                "strict": True,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"times": {"type": "integer"}},
+                    "required": [],
+                },
+            },
+        }
+    ]
+
+
+@pytest.mark.parametrize("annotation", [set[int], int | str, Annotated[int, {}]])
+def test_parameter_with_unsupported_annotation(annotation: object):
+    toolbox = Toolbox()
+
+    def tool(value: int):
+        return value
+
+    tool.__annotations__["value"] = annotation
+
+    with pytest.raises(ValueError, match="Unknown type"):
+        _ = toolbox.parameter(name="value")(tool)
+
+
+def test_execute_with_optional_and_unexpected_arguments():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Adds two numbers")
+    @toolbox.parameter(name="a", type="integer")
+    @toolbox.parameter(name="b", type="integer", required=False)
+    def add(a: int, b: int = 1):
+        return a + b
+
+    def tool_call(id: str, arguments: str):
+        return ChatCompletionMessageToolCall(
+            id=id,
+            type="function",
+            function=Function(name="add", arguments=arguments),
+        )
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            tool_call("1", '{"a": 2}'),
+            tool_call("2", '{"a": 2, "b": 3}'),
+            tool_call("3", '{"c": 2}'),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert [result.content for result in results[:2]] == ["3", "5"]
+    assert isinstance(results[2], ErrorResult)
+    assert isinstance(results[2].error, TypeError)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_execute_with_executor_runs_tool_calls_concurrently(parallel: bool):
+    toolbox = Toolbox()
+    barrier = threading.Barrier(2, timeout=5)
+
+    @toolbox.function(description="Waits for the other tool call")
+    @toolbox.parameter(name="who", type="string")
+    def wait(who: str):
+        _ = barrier.wait()
+        return who
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id=who,
+                type="function",
+                function=Function(name="wait", arguments=f'{{"who": "{who}"}}'),
+            )
+            for who in ("alice", "bob")
+        ],
+    )
+
+    if parallel:
+        results = toolbox.execute(message, parallel=True)
+    else:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = toolbox.execute(message, executor=executor)
+
+    assert all(isinstance(result, SuccessResult) for result in results)
+    assert [result.content for result in results] == ["alice", "bob"]
+
+
+def test_aexecute_awaits_coroutine_tools():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Greets someone asynchronously")
+    @toolbox.parameter(name="who", type="string")
+    async def greet(who: str):
+        await asyncio.sleep(0)
+        return f"Hello {who}"
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="greet", arguments='{"who": "world"}'),
+            ),
+        ],
+    )
+
+    results = asyncio.run(toolbox.aexecute(message))
+
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].content == "Hello world"
+
+
+def test_serialize_results_matches_model_dump():
+    tool_call = ChatCompletionMessageToolCall(
+        id="123",
+        type="function",
+        function=Function(name="hello_world", arguments='{"who": "world"}'),
+    )
+    extra_tool_call = ChatCompletionMessageToolCall.model_validate(
+        {
+            "id": "456",
+            "type": "function",
+            "index": 1,
+            "function": {"name": "hello_world", "arguments": "{}"},
+        }
+    )
+
+    results: list[SuccessResult | ErrorResult] = [
+        SuccessResult(tool_call=tool_call, name="hello_world", output="Hi"),
+        ErrorResult(
+            tool_call=extra_tool_call,
+            name="hello_world",
+            error=ValueError("boom"),
+        ),
+    ]
+    assistant_message, tool_messages = serialize_results(results)
+
+    assert assistant_message == {
+        "role": "assistant",
+        "tool_calls": [tool_call.model_dump(), extra_tool_call.model_dump()],
+    }
+    assert [message["content"] for message in tool_messages] == [
+        "Hi",
+        "Error executing hello_world: boom",
+    ]
+
+    # Serializing again reuses the cached tool call dicts
+    assistant_message_again, _ = serialize_results(results)
+    assert all(
+        again is first
+        for again, first in zip(
+            assistant_message_again["tool_calls"], assistant_message["tool_calls"]
+        )
+    )
+
+
+def test_redefining_a_function_replaces_its_parameters():
+    toolbox = Toolbox()
+
+    for _ in range(2):
+
+        @toolbox.function(description="A hello world function that greets someone")
+        @toolbox.parameter(name="who", type="string")
+        def hello_world(who: str):
+            return f"Hello {who}"
+
+    assert toolbox.tools == [
+        {
+            "type": "function",
+            "function": {
+                "name": "hello_world",
+                "description": "A hello world function that greets someone",
+                "strict": True,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"who": {"type": "string"}},
+                    "required": ["who"],
+                },
+            },
+        }
+    ]
+
+
+def test_parameters_reach_function_through_wrapping_decorators():
+    toolbox = Toolbox()
+
+    def logged(func: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    @toolbox.function(description="A hello world function that greets someone")
+    @logged
+    @toolbox.parameter(name="who", type="string")
+    def hello_world(who: str):
+        return f"Hello {who}"
+
+    assert toolbox.tools == [
+        {
+            "type": "function",
+            "function": {
+                "name": "hello_world",
+                "description": "A hello world function that greets someone",
+                "strict": True,
+                "parameters": {
+                    "type": "object",
+                    "properties": {"who": {"type": "string"}},
+                    "required": ["who"],
+                },
+            },
+        }
+    ]
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="hello_world", arguments='{"who": "world"}'),
+            ),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].content == "Hello world"
+
+
+@pytest.mark.parametrize("jit", [False, True])
+def test_parameter_below_function_raises(jit: bool):
+    toolbox = Toolbox()
+
+    # With numba installed, the registered callable is the compiled dispatcher
+    with pytest.raises(ValueError, match="Place @toolbox.function above"):
+
+        @toolbox.parameter(name="x", type="integer")
+        @toolbox.function(description="Doubles a number", jit=jit)
+        def double(x: int):
+            return x * 2
+
+
+def test_execute_with_invalid_json_arguments():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="A hello world function that greets someone")
+    @toolbox.parameter(name="who", type="string")
+    def hello_world(who: str):
+        return f"Hello {who}"
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="hello_world", arguments='{"who": '),
+            ),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert isinstance(results[0], ErrorResult)
+    assert isinstance(results[0].error, ValueError)
+
+
+@pytest.mark.parametrize("arguments", ["null", "[]", "0", "false", '""'])
+def test_execute_with_non_object_arguments(arguments: str):
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Returns the current time")
+    def now():
+        return "noon"
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="now", arguments=arguments),
+            ),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert isinstance(results[0], ErrorResult)
+    assert isinstance(results[0].error, ValueError)
+    assert str(results[0].error) == "Tool arguments must be a JSON object"
+
+
+def test_execute_with_orjson_number_parsing():
+    _ = pytest.importorskip("orjson")
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Echoes a number")
+    @toolbox.parameter(name="x", type="number")
+    def echo(x: float):
+        return x
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id=id,
+                type="function",
+                function=Function(name="echo", arguments=arguments),
+            )
+            for id, arguments in (
+                ("1", '{"x": 123456789012345678901234567890}'),
+                ("2", '{"x": NaN}'),
+            )
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    # Unlike json.loads, big integers lose precision and NaN is rejected
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].output == 1.2345678901234568e29
+    assert isinstance(results[1], ErrorResult)
+    assert isinstance(results[1].error, ValueError)
+
+
+def test_execute_jit_tool():
+    toolbox = Toolbox()
+
+    # Runs compiled when numba is installed, and as plain Python otherwise
+    @toolbox.function(description="Multiplies two numbers", jit=True)
+    @toolbox.parameter(name="a")
+    @toolbox.parameter(name="b")
+    def multiply(a: float, b: float):
+        return a * b
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="multiply", arguments='{"a": 1.5, "b": 4.0}'),
+            ),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].output == 6.0
+    assert multiply(2.0, 3.0) == 6.0
+
+
+@pytest.mark.parametrize("define", ["def", "exec"])
+def test_execute_jit_tool_is_compiled(define: str):
+    numba = pytest.importorskip("numba")
+    toolbox = Toolbox()
+
+    # Functions created by exec() can't use numba's on-disk cache
+    if define == "exec":
+        namespace: dict[str, Any] = {}
+        exec("def double(x: int):\n    return x * 2\n", namespace)
+        double = namespace["double"]
+    else:
+
+        def double(x: int):
+            return x * 2
+
+    _ = toolbox.function(description="Doubles a number", jit=True)(
+        toolbox.parameter(name="x")(double)
+    )
+
+    functions_data = toolbox._functions_data  # pyright: ignore[reportPrivateUsage]
+    assert isinstance(
+        functions_data["double"].callable, numba.core.registry.CPUDispatcher
+    )
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id="123",
+                type="function",
+                function=Function(name="double", arguments='{"x": 21}'),
+            ),
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].output == 42
+
+
+def test_execute_streaming_runs_tool_calls_as_arguments_complete():
+    toolbox = Toolbox()
+    greeted: list[str] = []
+
+    @toolbox.function(description="A hello world function that greets someone")
+    @toolbox.parameter(name="who", type="string")
+    def hello_world(who: str):
+        greeted.append(who)
+        return f"Hello {who}"
+
+    def delta(index: int, arguments: str, id: str | None = None):
+        return ChoiceDeltaToolCall(
+            index=index,
+            id=id,
+            type="function" if id else None,
+            function=ChoiceDeltaToolCallFunction(
+                name="hello_world" if id else None, arguments=arguments
+            ),
+        )
+
+    execution = toolbox.execute_streaming()
+    execution.feed([delta(0, "", id="123")])
+    execution.feed([delta(0, '{"who": ')])
+    execution.feed([delta(0, '"world"}')])
+    assert greeted == ["world"]
+
+    execution.feed(None)
+    execution.feed([delta(1, '{"who": "moon"', id="456")])
+    assert greeted == ["world"]
+
+    results = execution.finish()
+
+    assert greeted == ["world"]
+    assert isinstance(results[0], SuccessResult)
+    assert results[0].content == "Hello world"
+    assert results[0].tool_call.id == "123"
+    assert isinstance(results[1], ErrorResult)
+    assert results[1].tool_call.id == "456"
+
+
+def test_execute_tool_without_arguments():
+    toolbox = Toolbox()
+
+    @toolbox.function(description="Returns the current time")
+    def now():
+        return "noon"
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        tool_calls=[
+            ChatCompletionMessageToolCall(
+                id=id,
+                type="function",
+                function=Function(name="now", arguments=arguments),
+            )
+            for id, arguments in (("1", "{}"), ("2", ""), ("3", "{ }"))
+        ],
+    )
+
+    results = toolbox.execute(message)
+
+    assert [result.content for result in results] == ["noon", "noon", "noon"]
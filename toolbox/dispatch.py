@@ -0,0 +1,100 @@
+import inspect
+from collections.abc import Iterable, Mapping
+from typing import Any, Callable
+
+from toolbox.schema import Parameter
+
+# A dispatcher calls a tool with the arguments parsed from a tool call
+Dispatcher = Callable[[Mapping[str, Any]], Any]
+
+_POSITIONAL = (
+    inspect.Parameter.POSITIONAL_ONLY,
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+)
+_KEYWORD = (
+    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    inspect.Parameter.KEYWORD_ONLY,
+)
+
+
+def call_with_kwargs(fn: Callable[..., Any]) -> Dispatcher:
+    """Generic dispatcher, used whenever no specialized one can be generated."""
+
+    def dispatch(args: Mapping[str, Any]) -> Any:
+        return fn(**args)
+
+    return dispatch
+
+
+def build_dispatcher(
+    func: Callable[..., Any],
+    parameters: Iterable[Parameter],
+    fn: Callable[..., Any] | None = None,
+) -> Dispatcher:
+    """
+    Generates a dispatcher specialized to a tool's signature.
+
+    The generated code optimistically assumes the LLM passed exactly the
+    required parameters and hands them over directly (positionally where the
+    signature allows), avoiding generic **kwargs unpacking. Any other set of
+    arguments falls back to fn(**args), so errors surface exactly as before.
+    The callable is bound into the generated code, so a call is a single
+    dispatcher(args).
+
+    Args:
+        func: The Python function registered as a tool
+        parameters: The tool's Parameter objects
+        fn: The callable to invoke, if not func itself (e.g. its jit-compiled
+            version). func's signature is used either way.
+
+    Returns:
+        A callable taking the parsed arguments that invokes fn with them
+    """
+    if fn is None:
+        fn = func
+    required = {param.name for param in parameters if param.required}
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return call_with_kwargs(fn)
+
+    # Values are read into locals first so a KeyError raised by the tool itself
+    # is never mistaken for a missing argument
+    values: list[str] = []
+    call_args: list[str] = []
+    keyword_only = False
+    for name, param in signature.parameters.items():
+        if name not in required:
+            # Once a positional parameter is skipped, later ones go by keyword
+            keyword_only = keyword_only or param.kind in _POSITIONAL
+            continue
+        local = f"_{len(values)}"
+        values.append(f"args[{name!r}]")
+        if param.kind in _POSITIONAL and not keyword_only:
+            call_args.append(local)
+        elif param.kind in _KEYWORD:
+            call_args.append(f"{name}={local}")
+        else:
+            return call_with_kwargs(fn)
+
+    # Some schema parameter has no match in the Python signature (e.g. **kwargs)
+    if len(values) != len(required):
+        return call_with_kwargs(fn)
+
+    if values:
+        fast_path = (
+            f"    if len(args) == {len(values)}:\n"
+            "        try:\n"
+            f"            {', '.join(f'_{i}' for i in range(len(values)))}, = "
+            f"{', '.join(values)},\n"
+            "        except KeyError:\n"
+            "            return _f(**args)\n"
+            f"        return _f({', '.join(call_args)})\n"
+        )
+    else:
+        fast_path = "    if not args:\n        return _f()\n"
+
+    source = "def dispatch(args):\n" + fast_path + "    return _f(**args)\n"
+    namespace: dict[str, Any] = {"_f": fn}
+    exec(source, namespace)
+    return namespace["dispatch"]
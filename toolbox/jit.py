@@ -0,0 +1,66 @@
+# pyright: reportMissingImports=false, reportUnknownMemberType=false, reportUnknownVariableType=false
+import inspect
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def jit_compile(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Compiles a numeric tool function with numba.njit.
+
+    Only functions whose parameters are all annotated as int, float or bool are
+    compiled. The annotated signature is compiled eagerly so the first tool call
+    doesn't pay the compilation cost. Functions that can't be compiled (numba
+    isn't installed, non-numeric parameters, unsupported code) are returned
+    unchanged.
+
+    Args:
+        func: The Python function registered as a tool
+
+    Returns:
+        The compiled function, or func itself if it couldn't be compiled
+    """
+    try:
+        import numba
+        from numba.core.errors import NumbaError
+    except ImportError:
+        logger.warning("numba is not installed, not compiling %s", func.__name__)
+        return func
+
+    numba_types = {
+        int: numba.types.int64,
+        float: numba.types.float64,
+        bool: numba.types.boolean,
+    }
+
+    arg_types: list[Any] = []
+    for param in inspect.signature(func).parameters.values():
+        # Annotations may be strings or unhashable generics, only look up types
+        annotation = param.annotation
+        arg_type = numba_types.get(annotation) if isinstance(annotation, type) else None
+        if arg_type is None or param.kind in (
+            inspect.Parameter.VAR_POSITIONAL,
+            inspect.Parameter.VAR_KEYWORD,
+        ):
+            logger.warning(
+                "Parameter '%s' of %s is not int, float or bool, not compiling",
+                param.name,
+                func.__name__,
+            )
+            return func
+        arg_types.append(arg_type)
+
+    try:
+        try:
+            compiled = numba.njit(cache=True)(func)
+        except RuntimeError:
+            # Functions defined in a REPL or by exec() have no file to cache to
+            compiled = numba.njit(func)
+        _ = compiled.compile(tuple(arg_types))
+    except NumbaError:
+        logger.warning("numba could not compile %s", func.__name__, exc_info=True)
+        return func
+
+    return compiled
@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+# The results' _tool_call_dump cache is private to this module, not to their classes
+# pyright: reportPrivateUsage=false
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -11,20 +13,24 @@ if TYPE_CHECKING:
 ChatMessage = dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class SuccessResult:
     """Represents a successful tool execution result."""
 
     tool_call: "ChatCompletionMessageFunctionToolCall"
     name: str
     output: Any
+    # Serialized tool_call, cached by serialize_results on first use
+    _tool_call_dump: ChatMessage | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
-    def content(self):
+    def content(self) -> str:
         return str(self.output)
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorResult:
     """Represents an error during tool execution."""
 
@@ -33,24 +39,62 @@ class ErrorResult:
     )
     name: str
     error: Exception
+    # Serialized tool_call, cached by serialize_results on first use
+    _tool_call_dump: ChatMessage | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
-    def content(self):
+    def content(self) -> str:
         return f"Error executing {self.name}: {self.error}"
 
 
 Result = SuccessResult | ErrorResult
 
 
-def serialize_results(results: list[Result]):
+def _dump_tool_call(
+    tool_call: (
+        "ChatCompletionMessageFunctionToolCall | ChatCompletionMessageCustomToolCall"
+    ),
+) -> ChatMessage:
     """
-    Converts a list of Result dataclasses to a list of dicts.
+    Serializes a tool call to a dict, matching tool_call.model_dump().
+
+    Function tool calls have a fixed shape, so they are built directly instead of
+    going through pydantic's generic serializer. Tool calls carrying extra fields
+    still use model_dump() so nothing is dropped.
+    """
+    if tool_call.type == "function":
+        function = tool_call.function
+        if not tool_call.model_extra and not function.model_extra:
+            return {
+                "id": tool_call.id,
+                "function": {
+                    "arguments": function.arguments,
+                    "name": function.name,
+                },
+                "type": "function",
+            }
+    return tool_call.model_dump()
+
+
+def serialize_results(
+    results: list[Result],
+) -> tuple[ChatMessage, list[ChatMessage]]:
+    """
+    Converts a list of Result dataclasses to chat messages.
 
     Args:
         results: List of Result dataclasses (SuccessResult or ErrorResult)
 
     Returns:
-        List of dicts representing the results
+        Tuple of (assistant_message, tool_messages):
+        - Assistant message with the serialized tool_calls
+        - One tool response message per result, in the same order
+
+    Each result's serialized tool_call is cached on the result, so serializing
+    the same results again (e.g. for logging and for the next request) reuses
+    the same dicts. Treat them as read-only.
     """
     assistant_message: ChatMessage = {
         "role": "assistant",
@@ -58,7 +102,10 @@ def serialize_results(results: list[Result]):
     }
     serialized_results: list[ChatMessage] = []
     for result in results:
-        assistant_message["tool_calls"].append(result.tool_call.model_dump())
+        tool_call_dump = result._tool_call_dump
+        if tool_call_dump is None:
+            tool_call_dump = result._tool_call_dump = _dump_tool_call(result.tool_call)
+        assistant_message["tool_calls"].append(tool_call_dump)
         serialized_results.append(
             {
                 "tool_call_id": result.tool_call.id,
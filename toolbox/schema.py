@@ -1,13 +1,24 @@
+import functools
+import typing
 from collections.abc import Iterable
 from dataclasses import dataclass, field
 from numbers import Number
-from typing import TYPE_CHECKING, Any, Callable, NotRequired, TypedDict
+from types import UnionType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    NotRequired,
+    TypedDict,
+    get_args,
+    get_origin,
+)
 
 if TYPE_CHECKING:
     from openai.types.chat import ChatCompletionToolUnionParam
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Parameter:
     """Represents a parameter for a tool function."""
 
@@ -18,7 +29,7 @@ class Parameter:
     enum: list[str | int | float | bool] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Function:
     """Represents a tool function with its metadata."""
 
@@ -36,43 +47,112 @@ class ParameterSchema(TypedDict):
     enum: NotRequired[list[str | int | float | bool]]
 
 
-def python_type_to_json_schema_type(python_type: type | str):
+# Origins of Optional[X] / Union[X, Y] and of X | Y annotations
+_UNION_TYPES = (typing.Union, UnionType)  # pyright: ignore[reportDeprecated]
+
+# Maps Python types to JSON schema type strings
+_TYPE_MAPPING: dict[Any, str] = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+    Number: "number",
+}
+
+# Same mapping for string annotations (forward references)
+_TYPE_MAPPING_STR: dict[str, str] = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "dict": "object",
+}
+
+
+def python_type_to_json_schema_type(python_type: type | str) -> str:
     """
     Converts Python type annotations to JSON schema type strings.
+    Optional annotations (e.g. `int | None`) map to the type they wrap.
     """
-    # Handle basic types
-    type_mapping = {
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        list: "array",
-        dict: "object",
-        Number: "number",
-    }
+    try:
+        return _python_type_to_json_schema_type(python_type)
+    except TypeError:
+        # Unhashable annotations (e.g. Annotated with dict metadata) can't be
+        # cached, and can't match a known type either
+        raise ValueError(f"Unknown type: {python_type}") from None
+
+
+@functools.lru_cache(maxsize=256)
+def _python_type_to_json_schema_type(python_type: type | str) -> str:
+    # Unwrap Optional[X] / X | None
+    if get_origin(python_type) in _UNION_TYPES:
+        args = [arg for arg in get_args(python_type) if arg is not type(None)]
+        if len(args) == 1:
+            python_type = args[0]
 
     # Check if it's a direct type match
-    if python_type in type_mapping:
-        return type_mapping[python_type]
+    if python_type in _TYPE_MAPPING:
+        return _TYPE_MAPPING[python_type]
 
     # Handle string annotations (forward references)
     if isinstance(python_type, str):
-        type_mapping_str = {
-            "str": "string",
-            "int": "integer",
-            "float": "number",
-            "bool": "boolean",
-            "list": "array",
-            "dict": "object",
-        }
-        return type_mapping_str.get(python_type, "string")
+        return _TYPE_MAPPING_STR.get(python_type, "string")
 
     raise ValueError(f"Unknown type: {python_type}")
 
 
+def build_function_schema(
+    func_data: Function,
+) -> "ChatCompletionToolUnionParam | None":
+    """
+    Builds the OpenAI tool definition for a single Function object.
+
+    Args:
+        func_data: The Function object to convert
+
+    Returns:
+        The tool definition in OpenAI format, or None if the function hasn't been
+        fully registered (has no name or description)
+    """
+    if not func_data.name or not func_data.description:
+        return None
+
+    # Build properties dict from Parameter objects
+    properties: dict[str, ParameterSchema] = {}
+    required: list[str] = []
+
+    for param in func_data.parameters:
+        param_dict: ParameterSchema = {"type": param.type}
+        if param.description:
+            param_dict["description"] = param.description
+        if param.enum:
+            param_dict["enum"] = param.enum
+        properties[param.name] = param_dict
+
+        if param.required:
+            required.append(param.name)
+
+    return {
+        "type": "function",
+        "function": {
+            "name": func_data.name,
+            "description": func_data.description,
+            "strict": True,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+            },
+        },
+    }
+
+
 def build_tools_schema(
     functions: Iterable[Function],
-) -> Iterable["ChatCompletionToolUnionParam"]:
+) -> list["ChatCompletionToolUnionParam"]:
     """
     Builds the OpenAI tool schema from a list of Function objects.
 
@@ -85,38 +165,8 @@ def build_tools_schema(
     schema: list["ChatCompletionToolUnionParam"] = []
     for func_data in functions:
         # Only include functions that have been fully registered (have name and description)
-        if not func_data.name or not func_data.description:
-            continue
-
-        # Build properties dict from Parameter objects
-        properties: dict[str, ParameterSchema] = {}
-        required: list[str] = []
-
-        for param in func_data.parameters:
-            param_dict: ParameterSchema = {"type": param.type}
-            if param.description:
-                param_dict["description"] = param.description
-            if param.enum:
-                param_dict["enum"] = param.enum
-            properties[param.name] = param_dict
-
-            if param.required:
-                required.append(param.name)
-
-        schema.append(
-            {
-                "type": "function",
-                "function": {
-                    "name": func_data.name,
-                    "description": func_data.description,
-                    "strict": True,
-                    "parameters": {
-                        "type": "object",
-                        "properties": properties,
-                        "required": required,
-                    },
-                },
-            }
-        )
+        tool_definition = build_function_schema(func_data)
+        if tool_definition is not None:
+            schema.append(tool_definition)
 
     return schema
@@ -1,16 +1,37 @@
+import asyncio
 import inspect
-import json
 import logging
-from typing import TYPE_CHECKING, Callable, ParamSpec, TypeVar
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, ParamSpec, TypeVar
 
 if TYPE_CHECKING:
-    from openai.types.chat import ChatCompletionMessage
+    from json import loads as _json_loads
+else:
+    # orjson parses integers beyond 64 bits as floats and rejects NaN/Infinity,
+    # both of which json accepts
+    try:
+        from orjson import loads as _json_loads
+    except ImportError:
+        from json import loads as _json_loads
 
+if TYPE_CHECKING:
+    from openai.types.chat import (
+        ChatCompletionMessage,
+        ChatCompletionMessageToolCallUnion,
+        ChatCompletionToolUnionParam,
+    )
+    from openai.types.chat.chat_completion_chunk import ChoiceDeltaToolCall
+
+from toolbox.dispatch import Dispatcher, build_dispatcher
+from toolbox.jit import jit_compile
 from toolbox.messages import ErrorResult, Result, SuccessResult
 from toolbox.schema import (
     Function,
     Parameter,
-    build_tools_schema,
+    build_function_schema,
     python_type_to_json_schema_type,
 )
 
@@ -20,16 +41,45 @@ logger = logging.getLogger(__name__)
 P = ParamSpec("P")
 R = TypeVar("R")
 
+# Sentinel for missing annotations, always compared by identity
+_EMPTY = inspect.Parameter.empty
+
+# Arguments sent for tools that take none ("" by some OpenAI-compatible servers)
+_NO_ARGUMENTS_JSON = ("{}", "")
+_NO_ARGUMENTS: Mapping[str, Any] = MappingProxyType({})
+
 
 class Toolbox:
     def __init__(self):
-        # Maps function names to Function data objects (may be partially populated)
+        # Maps function names to registered Function data objects
         self._functions_data: dict[str, Function] = {}
+        # Parameters declared by @toolbox.parameter, waiting for @toolbox.function.
+        # Keyed by the unwrapped function, so decorators in between don't matter
+        self._pending_parameters: dict[Callable[..., Any], list[Parameter]] = {}
+        # Maps function names to the unwrapped functions registered under them,
+        # which Function.callable isn't when the tool was jit-compiled
+        self._registered_functions: dict[str, Callable[..., Any]] = {}
+        # Maps function names to their tool definitions, built once at registration
+        self._tool_definitions: dict[str, "ChatCompletionToolUnionParam"] = {}
+        # List of tool definitions, reset to None whenever a tool is registered
+        self._tools_schema: list["ChatCompletionToolUnionParam"] | None = None
+        # Maps function names to dispatchers generated for their signatures, which
+        # call the tool directly, so a call needs a single lookup
+        self._dispatch: dict[str, Dispatcher] = {}
 
     @property
-    def tools(self):
-        """Returns the list of tool definitions for the OpenAI API."""
-        return build_tools_schema(self._functions_data.values())
+    def tools(self) -> list["ChatCompletionToolUnionParam"]:
+        """
+        Returns the list of tool definitions for the OpenAI API.
+
+        Tool definitions are built once when a function is registered, and the
+        list is cached until another tool is registered, so reading it before
+        every request is cheap. The same list is returned every time; treat it
+        as read-only and copy it before adding tools of your own.
+        """
+        if self._tools_schema is None:
+            self._tools_schema = list(self._tool_definitions.values())
+        return self._tools_schema
 
     def parameter(
         self,
@@ -54,20 +104,33 @@ class Toolbox:
         """
 
         def decorator(func: Callable[P, R]) -> Callable[P, R]:
-            func_name = func.__name__
+            # Parameters are collected for @toolbox.function, which has already run
+            # if it was placed below this decorator
+            original = inspect.unwrap(func)
+            if self._registered_functions.get(func.__name__) is original:
+                raise ValueError(
+                    f"Parameter '{name}' was declared after function '{func.__name__}' "
+                    + "was registered. Place @toolbox.function above @toolbox.parameter."
+                )
 
             # If type is not provided, extract it from the function's type annotation
             param_type = type
             if param_type is None:
-                sig = inspect.signature(func)
-                param = sig.parameters.get(name)
-                if param is None:
-                    raise ValueError(
-                        f"Parameter '{name}' not found in function '{func.__name__}' signature"
-                    )
-
-                annotation = param.annotation
-                if annotation == inspect.Parameter.empty:
+                # Read the annotation directly, so stacked decorators don't each
+                # build an inspect.Signature for the same function
+                annotations = getattr(func, "__annotations__", {})
+                annotation = annotations.get(name, _EMPTY)
+                if annotation is _EMPTY:
+                    # Fall back to the signature, which also tells a missing
+                    # parameter apart from a missing annotation
+                    param = inspect.signature(func).parameters.get(name)
+                    if param is None:
+                        raise ValueError(
+                            f"Parameter '{name}' not found in function '{func.__name__}' signature"
+                        )
+                    annotation = param.annotation
+
+                if annotation is _EMPTY:
                     raise ValueError(
                         f"Parameter '{name}' in function '{func.__name__}' has no type annotation "
                         + "and no 'type' argument was provided. Either provide a type annotation "
@@ -85,19 +148,15 @@ class Toolbox:
                 enum=enum,
             )
 
-            # Get or create Function object for this function name
-            if func_name not in self._functions_data:
-                self._functions_data[func_name] = Function()
-
-            # Append Parameter to the Function's parameters list
-            self._functions_data[func_name].parameters.append(param_obj)
+            # Hold the Parameter until @toolbox.function registers this function
+            self._pending_parameters.setdefault(original, []).append(param_obj)
 
             # Return function unchanged (no modification to function object)
             return func
 
         return decorator
 
-    def function(self, description: str | None = None):
+    def function(self, description: str | None = None, jit: bool = False):
         """
         Decorator to register the function as a tool.
         This must be placed *above* @toolbox.parameter decorators.
@@ -105,99 +164,331 @@ class Toolbox:
         Args:
             description: Optional description of the function. If not provided,
                         the function's docstring will be used.
+            jit: If true, compile the tool with numba.njit when all of its
+                 parameters are int, float or bool. execute() calls the compiled
+                 version; the decorated function itself is returned unchanged.
         """
 
         def decorator(func: Callable[P, R]) -> Callable[P, R]:
             func_name = func.__name__
 
-            # Get or create Function object from _functions_data
-            if func_name not in self._functions_data:
-                self._functions_data[func_name] = Function()
-
             # Use provided description or fall back to function's docstring
             func_description = description
             if func_description is None:
                 func_description = inspect.getdoc(func) or ""
 
-            # Populate/update Function object with name, description, and callable
-            func_data = self._functions_data[func_name]
-            func_data.name = func_name
-            func_data.description = func_description
-            func_data.callable = func
-
-            # Return function unchanged (or wrapped if needed for execution)
+            # Create the Function object, consuming the parameters declared below
+            original = inspect.unwrap(func)
+            fn = jit_compile(func) if jit else func
+            func_data = Function(
+                name=func_name,
+                description=func_description,
+                callable=fn,
+                parameters=self._pending_parameters.pop(original, []),
+            )
+            self._functions_data[func_name] = func_data
+            self._registered_functions[func_name] = original
+            self._dispatch[func_name] = build_dispatcher(func, func_data.parameters, fn)
+
+            # Build the tool definition now that all parameters are attached
+            tool_definition = build_function_schema(func_data)
+            if tool_definition is None:
+                _ = self._tool_definitions.pop(func_name, None)
+            else:
+                self._tool_definitions[func_name] = tool_definition
+            self._tools_schema = None
+
+            # Return function unchanged, so direct calls pay no wrapper overhead
             return func
 
         return decorator
 
-    def execute(self, message: "ChatCompletionMessage") -> list[Result]:
+    def execute(
+        self,
+        message: "ChatCompletionMessage",
+        executor: Executor | None = None,
+        parallel: bool = False,
+        max_workers: int = 8,
+    ) -> list[Result]:
         """
         Executes tool calls from an OpenAI chat completion message.
 
         Args:
             message: The ChatCompletionMessage containing tool_calls
+            executor: Optional executor (e.g. a ThreadPoolExecutor) used to run the
+                      tool calls concurrently. It must run them in threads of
+                      this process: the toolbox can't be pickled, so a
+                      ProcessPoolExecutor fails. Tools must be thread-safe.
+            parallel: If true and no executor is given, run multiple tool calls on
+                      a temporary thread pool. Meant for I/O-bound tools; CPU-bound
+                      tools gain nothing from threads and should leave this off.
+            max_workers: Maximum number of threads used when parallel is true
 
         Returns:
-            Tuple of (assistant_message_dict, list_of_tool_result_dicts):
-            - Assistant message with tool_calls (serialized)
-            - Tool response messages
+            List of SuccessResult/ErrorResult objects, in the same order as the
+            message's tool_calls. Pass them to serialize_results() to build the
+            messages for the next request.
         """
-        tool_calls = message.tool_calls or []
+        tool_calls = message.tool_calls
+        # Most completions are plain text responses without tool calls
+        if not tool_calls:
+            return []
 
-        results: list[Result] = []
+        if executor is None and parallel and len(tool_calls) > 1:
+            with ThreadPoolExecutor(min(max_workers, len(tool_calls))) as pool:
+                return self._execute_on(pool, tool_calls)
 
-        for tool_call in tool_calls:
-            # Only handle function tool calls (not custom tool calls)
-            if tool_call.type != "function":
-                # Store result as ErrorResult dataclass
-                results.append(
-                    ErrorResult(
-                        tool_call=tool_call,
-                        name="unknown",
-                        error=ValueError(
-                            f"Skipping tool call of type '{tool_call.type}' - only 'function' type is supported"
-                        ),
-                    )
-                )
-                continue
+        if executor is not None:
+            return self._execute_on(executor, tool_calls)
 
-            fn_name = tool_call.function.name
-            fn_args_str = tool_call.function.arguments
+        return [self._execute_tool_call(tool_call) for tool_call in tool_calls]
 
-            try:
-                if fn_name not in self._functions_data:
-                    raise ValueError(f"Function {fn_name} not found in toolbox.")
+    def _execute_on(
+        self,
+        executor: Executor,
+        tool_calls: "list[ChatCompletionMessageToolCallUnion]",
+    ) -> list[Result]:
+        # Results are collected in submission order, matching tool_calls
+        futures = [
+            executor.submit(self._execute_tool_call, tool_call)
+            for tool_call in tool_calls
+        ]
+        return [future.result() for future in futures]
+
+    async def aexecute(self, message: "ChatCompletionMessage") -> list[Result]:
+        """
+        Executes tool calls from an OpenAI chat completion message, awaiting
+        coroutine tools concurrently.
 
-                func_data = self._functions_data[fn_name]
-                if func_data.callable is None:
-                    raise ValueError(f"Function {fn_name} has no callable.")
+        Synchronous tools are called inline on the event loop.
 
-                # Parse JSON arguments from LLM
-                fn_args = json.loads(fn_args_str)
-                logger.info(
-                    f"Invoking tool: {fn_name}({', '.join(f'{k}={v}' for k, v in fn_args.items())})"
-                )
+        Args:
+            message: The ChatCompletionMessage containing tool_calls
 
-                # Execute the actual Python function
-                output = func_data.callable(**fn_args)
+        Returns:
+            List of results, in the same order as the message's tool_calls
+        """
+        tool_calls = message.tool_calls
+        if not tool_calls:
+            return []
 
-                # Store result as SuccessResult dataclass
-                results.append(
-                    SuccessResult(
-                        tool_call=tool_call,
-                        name=fn_name,
-                        output=output,
-                    )
-                )
+        return list(
+            await asyncio.gather(
+                *(self._aexecute_tool_call(tool_call) for tool_call in tool_calls)
+            )
+        )
 
-            except Exception as e:
-                # Store result as ErrorResult dataclass
-                results.append(
-                    ErrorResult(
-                        tool_call=tool_call,
-                        name=fn_name,
-                        error=e,
-                    )
-                )
+    def execute_streaming(self) -> "StreamingExecution":
+        """
+        Starts executing tool calls as they arrive from a streamed chat completion.
 
+        Feed each chunk's delta.tool_calls to the returned object; tool calls are
+        executed as soon as their arguments are complete, and finish() returns
+        all the results. Coroutine tools are not awaited.
+
+        Example:
+            execution = toolbox.execute_streaming()
+            for chunk in stream:
+                execution.feed(chunk.choices[0].delta.tool_calls)
+            results = execution.finish()
+        """
+        return StreamingExecution(self._execute_tool_call)
+
+    def _execute_tool_call(
+        self,
+        tool_call: "ChatCompletionMessageToolCallUnion",
+        fn_args: dict[str, Any] | None = None,
+    ) -> Result:
+        """
+        Executes a single tool call, capturing any error in an ErrorResult.
+        If fn_args is given, it is used instead of parsing the tool call's arguments.
+        """
+        # Only handle function tool calls (not custom tool calls)
+        if tool_call.type != "function":
+            return self._unsupported_tool_call(tool_call)
+
+        function = tool_call.function
+        fn_name = function.name
+
+        try:
+            output = self._call(
+                fn_name, function.arguments if fn_args is None else fn_args
+            )
+        except Exception as e:
+            return ErrorResult(tool_call=tool_call, name=fn_name, error=e)
+
+        return SuccessResult(tool_call=tool_call, name=fn_name, output=output)
+
+    async def _aexecute_tool_call(
+        self, tool_call: "ChatCompletionMessageToolCallUnion"
+    ) -> Result:
+        """Async counterpart of _execute_tool_call, awaiting coroutine tools."""
+        if tool_call.type != "function":
+            return self._unsupported_tool_call(tool_call)
+
+        function = tool_call.function
+        fn_name = function.name
+
+        try:
+            output = self._call(fn_name, function.arguments)
+            if inspect.isawaitable(output):
+                output = await output
+        except Exception as e:
+            return ErrorResult(tool_call=tool_call, name=fn_name, error=e)
+
+        return SuccessResult(tool_call=tool_call, name=fn_name, output=output)
+
+    def _unsupported_tool_call(
+        self, tool_call: "ChatCompletionMessageToolCallUnion"
+    ) -> ErrorResult:
+        return ErrorResult(
+            tool_call=tool_call,
+            name="unknown",
+            error=ValueError(
+                f"Skipping tool call of type '{tool_call.type}' - only 'function' type is supported"
+            ),
+        )
+
+    def _call(self, fn_name: str, arguments: str | dict[str, Any]) -> Any:
+        """
+        Looks up a registered function, parses its JSON arguments (unless already
+        parsed) and calls it.
+
+        Raises:
+            ValueError: If the function isn't registered or the arguments are not
+                        a valid JSON object. Anything raised by the function
+                        itself.
+        """
+        dispatch = self._dispatch.get(fn_name)
+        if dispatch is None:
+            raise ValueError(f"Function {fn_name} not found in toolbox.")
+
+        # Parse JSON arguments from LLM
+        fn_args: Mapping[str, Any]
+        if not isinstance(arguments, str):
+            fn_args = arguments
+        elif arguments in _NO_ARGUMENTS_JSON:
+            # Zero-argument tools don't need a trip through the JSON parser
+            fn_args = _NO_ARGUMENTS
+        else:
+            fn_args = _json_loads(arguments)
+            if not isinstance(fn_args, dict):
+                raise ValueError("Tool arguments must be a JSON object")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Invoking tool: %s(%s)",
+                fn_name,
+                ", ".join(f"{k}={v}" for k, v in fn_args.items()),
+            )
+
+        # Execute the actual Python function
+        return dispatch(fn_args)
+
+
+@dataclass(slots=True)
+class _StreamedToolCall:
+    """A tool call being assembled from streamed deltas."""
+
+    id: str = ""
+    name: str = ""
+    # Argument fragments, only joined when they may form a complete JSON value
+    chunks: list[str] = field(default_factory=list)
+    result: Result | None = None
+
+
+# Executes a tool call, optionally with its arguments already parsed
+_ExecuteToolCall = Callable[
+    ["ChatCompletionMessageToolCallUnion", dict[str, Any] | None], Result
+]
+
+
+class StreamingExecution:
+    """
+    Assembles tool calls from streamed chat completion deltas and executes each
+    one as soon as its arguments are complete. Created by
+    Toolbox.execute_streaming().
+    """
+
+    def __init__(self, execute_tool_call: _ExecuteToolCall):
+        # Toolbox._execute_tool_call of the toolbox that started the execution
+        self._execute_tool_call: _ExecuteToolCall = execute_tool_call
+        # Maps delta indexes to the tool calls being assembled
+        self._tool_calls: dict[int, _StreamedToolCall] = {}
+
+    def feed(self, delta_tool_calls: "Iterable[ChoiceDeltaToolCall] | None"):
+        """
+        Adds the tool call deltas of one streamed chunk.
+
+        Args:
+            delta_tool_calls: The chunk's choices[0].delta.tool_calls
+        """
+        if not delta_tool_calls:
+            return
+
+        for delta in delta_tool_calls:
+            streamed = self._tool_calls.get(delta.index)
+            if streamed is None:
+                streamed = self._tool_calls[delta.index] = _StreamedToolCall()
+
+            if delta.id:
+                streamed.id = delta.id
+            function = delta.function
+            if function is None:
+                continue
+            if function.name:
+                streamed.name += function.name
+            if function.arguments:
+                streamed.chunks.append(function.arguments)
+                self._execute_if_complete(streamed)
+
+    def finish(self) -> list[Result]:
+        """
+        Executes any tool calls that haven't completed yet (e.g. ones whose
+        arguments never became valid JSON, which end up as ErrorResults).
+
+        Returns:
+            List of results, in the order of the tool calls in the stream
+        """
+        results: list[Result] = []
+        for _, streamed in sorted(self._tool_calls.items()):
+            if streamed.result is None:
+                streamed.result = self._execute_tool_call(
+                    self._to_tool_call(streamed, "".join(streamed.chunks)), None
+                )
+            results.append(streamed.result)
         return results
+
+    def _execute_if_complete(self, streamed: _StreamedToolCall):
+        if streamed.result is not None or not streamed.name:
+            return
+
+        # Only attempt a parse when the arguments could be a complete JSON value,
+        # so they aren't re-parsed from scratch on every chunk
+        tail = streamed.chunks[-1].rstrip()
+        if not tail or tail[-1] not in "}]":
+            return
+
+        arguments = "".join(streamed.chunks)
+        try:
+            fn_args: dict[str, Any] | None = _json_loads(arguments)
+        except ValueError:
+            return
+        if not isinstance(fn_args, dict):
+            # Let _call reject arguments that aren't a JSON object
+            fn_args = None
+
+        streamed.result = self._execute_tool_call(
+            self._to_tool_call(streamed, arguments), fn_args
+        )
+
+    def _to_tool_call(self, streamed: _StreamedToolCall, arguments: str):
+        from openai.types.chat import ChatCompletionMessageFunctionToolCall
+        from openai.types.chat.chat_completion_message_function_tool_call import (
+            Function as ToolCallFunction,
+        )
+
+        return ChatCompletionMessageFunctionToolCall(
+            id=streamed.id,
+            type="function",
+            function=ToolCallFunction(name=streamed.name, arguments=arguments),
+        )